@@ -1,18 +1,25 @@
-
 # dds661.py
 # High-level library for DDS661 Modbus RTU meter (pymodbus-version agnostic).
 #
 # - Uses struct for float32 <-> 2x16bit registers (ABCD: high word then low word).
 # - Compatible with pymodbus variants that use either method="rtu" or framer=ModbusRtuFramer.
-# - Automatically handles slave/unit kwarg differences in read/write calls.
+# - Automatically handles slave/unit kwarg differences in read/write calls
+#   (both resolved once at import, not per call).
+# - One BusClient owns the serial client (lazy connect, kept open) and can be shared by
+#   every unit on the same RS-485 bus; drivers only pick the unit id per request.
+#   A TcpLink gives the same BusClient over Modbus TCP (e.g. an RTU<->TCP gateway).
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, Dict, Tuple, Any, Callable
+from typing import Optional, Dict, Tuple, Any, Callable, Union
+import functools
+import inspect
+import socket
 import struct
+import time
 
-from pymodbus.client import ModbusSerialClient
-from pymodbus.exceptions import ModbusException
+from pymodbus.client import ModbusSerialClient, ModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusException
 
 # ---------------- Register map (addresses are the High Word) ---------------
 REG_BAUD   = 0x0000  # float32 (2 regs)
@@ -28,9 +35,29 @@ IN_E_TOT   = 0x0100  # float32
 IN_E_POS   = 0x0102  # float32
 IN_E_REV   = 0x0103  # float32
 
+MEAS_FIELDS = ("voltage", "current", "p_active", "pf", "freq", "e_total", "e_pos", "e_rev")
+
+# Measurement name -> input register (float32 start address)
+INPUT_MAP = {
+    "voltage": IN_VOLTAGE,
+    "current": IN_CURRENT,
+    "p_active": IN_P_ACT,
+    "pf": IN_PF,
+    "freq": IN_FREQ,
+    "e_total": IN_E_TOT,
+    "e_pos": IN_E_POS,
+    "e_rev": IN_E_REV,
+}
+
+# Largest hole (in registers) read through to merge two fields into one request:
+# 24 keeps 0x0000-0x0037 and 0x0100-0x0104 as the two bulk reads.
+MAX_READ_GAP = 24
+
+MODBUS_MAX_READ = 125  # registers per read request (protocol limit)
+
 # ------------------------------- Dataclasses -------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class LinkConfig:
     port: str = "/dev/ttyCOM1"
     baudrate: int = 9600
@@ -38,14 +65,24 @@ class LinkConfig:
     stopbits: int = 1
     bytesize: int = 8
     timeout: float = 1.0
+    fast_rtu: bool = False  # fast RTU profile: short receive sleep, reply-sized timeouts (see _tune_rtu)
+    inter_byte_timeout: Optional[float] = None  # pyserial inter-byte timeout, s (fast_rtu: 3.5 chars)
 
-@dataclass
+@dataclass(slots=True)
+class TcpLink:
+    host: str = "192.168.0.99"
+    port: int = 502
+    timeout: float = 1.0
+
+Link = Union[LinkConfig, TcpLink]
+
+@dataclass(slots=True)
 class Params:
     baud: float
     parity: float
     slave: float
 
-@dataclass
+@dataclass(slots=True)
 class Measurements:
     voltage: float
     current: float
@@ -58,154 +95,410 @@ class Measurements:
 
 # -------------------------- Float <-> Registers ----------------------------
 
+_F32 = struct.Struct('>f')   # big-endian float32
+_HH = struct.Struct('>HH')   # two big-endian 16-bit registers, high word first
+# Bound methods: one C call per conversion, no attribute lookup
+_f32_pack, _f32_unpack, _f32_unpack_from = _F32.pack, _F32.unpack, _F32.unpack_from
+_hh_pack, _hh_unpack = _HH.pack, _HH.unpack
+
+def _plan_ranges(spans, max_gap: int = 2, max_count: int = MODBUS_MAX_READ):
+    """Merge (addr, count) spans into the fewest reads: ([(start, count)], {addr: (range, offset)})."""
+    ranges: list[Tuple[int, int]] = []
+    where: Dict[int, Tuple[int, int]] = {}
+    for addr, count in sorted(set(spans)):
+        if ranges:
+            start, cur = ranges[-1]
+            end = max(start + cur, addr + count)
+            if addr - (start + cur) <= max_gap and end - start <= max_count:
+                ranges[-1] = (start, end - start)
+                where[addr] = (len(ranges) - 1, addr - start)
+                continue
+        ranges.append((addr, count))
+        where[addr] = (len(ranges) - 1, 0)
+    return ranges, where
+
+# (driver class, field names) -> read plan, filled by _ModbusMeter._read_groups()
+_READ_GROUPS: Dict[Tuple[type, Tuple[str, ...]], list] = {}
+
 def _float_to_registers(value: float) -> Tuple[int, int]:
-    b = struct.pack('>f', float(value))  # big-endian float32: b0 b1 b2 b3
-    hi = (b[0] << 8) | b[1]
-    lo = (b[2] << 8) | b[3]
-    return hi, lo
+    return _hh_unpack(_f32_pack(float(value)))
 
 def _registers_to_float(regs: Tuple[int, int]) -> float:
-    hi, lo = int(regs[0]) & 0xFFFF, int(regs[1]) & 0xFFFF
-    b = bytes([(hi >> 8) & 0xFF, hi & 0xFF, (lo >> 8) & 0xFF, lo & 0xFF])
-    return struct.unpack('>f', b)[0]
+    return _f32_unpack(_hh_pack(regs[0] & 0xFFFF, regs[1] & 0xFFFF))[0]
+
+@functools.lru_cache(maxsize=None)
+def _u16_pack(n: int) -> Callable[..., bytes]:
+    """Bound pack for n big-endian registers; block sizes repeat, so the format is compiled once."""
+    return struct.Struct(f'>{n}H').pack
+
+def _decode_block(regs: list[int], fields: Dict[str, int]) -> Dict[str, float]:
+    """Float32 at each register offset of a block (packed once; odd offsets as DDS661 e_rev are fine)."""
+    buf = _u16_pack(len(regs))(*regs)
+    return {name: _f32_unpack_from(buf, 2 * off)[0] for name, off in fields.items()}
 
 # ---------------------- pymodbus compat (slave/unit) -----------------------
+# Resolved once at import: which kwarg carries the unit id, and how the serial
+# client wants to be told to use RTU framing.
 
-def _call_with_unit(func: Callable[..., Any], *, address: int, count: int, unit_id: int):
-    last_exc: Optional[TypeError] = None
-    for kw in ("slave", "unit", "unit_id", "device_id"):
+_UNIT_KWS = ("slave", "unit", "unit_id", "device_id")
+
+def _signature_params(func: Callable[..., Any]) -> Dict[str, inspect.Parameter]:
+    try:
+        return dict(inspect.signature(func).parameters)
+    except (TypeError, ValueError):
+        return {}
+
+def _resolve_unit_kw() -> Optional[str]:
+    params = _signature_params(ModbusSerialClient.read_holding_registers)
+    for kw in _UNIT_KWS:
+        if kw in params:
+            return kw
+    return None  # hidden in **kwargs: probed on the first call instead
+
+def _resolve_rtu_framer() -> Any:
+    try:
+        from pymodbus.framer.rtu_framer import ModbusRtuFramer  # newer
+        return ModbusRtuFramer
+    except Exception:
         try:
-            return func(address=address, count=count, **{kw: unit_id})
-        except TypeError as exc:
-            if f"unexpected keyword argument '{kw}'" not in str(exc):
-                raise
-            last_exc = exc
-    if last_exc is not None:
-        raise last_exc
-    return func(address=address, count=count)
+            from pymodbus.framer.rtu import ModbusRtuFramer      # older 3.x
+            return ModbusRtuFramer
+        except Exception:
+            return None
+
+def _resolve_ctor_mode() -> str:
+    params = _signature_params(ModbusSerialClient.__init__)
+    if _RTU_FRAMER is not None and "framer" in params:
+        return "framer"
+    if "method" in params:
+        return "method"
+    return "plain"  # no framer/method argument accepted: RTU is the default
+
+_UNIT_KW: Optional[str] = _resolve_unit_kw()
+_RTU_FRAMER = _resolve_rtu_framer()
+_CTOR_MODE = _resolve_ctor_mode()
 
-def _write_with_unit(func: Callable[..., Any], *, address: int, values: list[int], unit_id: int):
+def _probe_unit_kw(func: Callable[..., Any], unit_id: int, **kwargs: Any):
+    global _UNIT_KW
     last_exc: Optional[TypeError] = None
-    for kw in ("slave", "unit", "unit_id", "device_id"):
+    for kw in _UNIT_KWS:
         try:
-            return func(address=address, values=values, **{kw: unit_id})
+            result = func(**kwargs, **{kw: unit_id})
         except TypeError as exc:
             if f"unexpected keyword argument '{kw}'" not in str(exc):
                 raise
             last_exc = exc
+            continue
+        _UNIT_KW = kw
+        return result
     if last_exc is not None:
         raise last_exc
-    return func(address=address, values=values)
+    return func(**kwargs)
+
+def _bind_unit(func: Callable[..., Any], unit_id: int) -> Callable[..., Any]:
+    """Return func with the unit id pre-bound under the resolved kwarg."""
+    if _UNIT_KW is None:
+        return functools.partial(_probe_unit_kw, func, unit_id)
+    return functools.partial(func, **{_UNIT_KW: unit_id})
 
 # --------------------------------- Client ----------------------------------
 
-class DDS661:
-    def __init__(self, link: LinkConfig, unit: int = 1):
-        self.link = link
-        self.unit = int(unit)
+def _client_factory(link: Link) -> Callable[[], Any]:
+    """Bind the link settings (and for serial, the resolved RTU ctor form) into one callable."""
+    if isinstance(link, TcpLink):
+        return functools.partial(ModbusTcpClient, host=link.host, port=int(link.port), timeout=float(link.timeout))
+    kwargs: Dict[str, Any] = dict(
+        port=link.port,
+        baudrate=link.baudrate,
+        parity=link.parity,
+        stopbits=link.stopbits,
+        bytesize=link.bytesize,
+        timeout=link.timeout,
+    )
+    if _CTOR_MODE == "framer":
+        kwargs["framer"] = _RTU_FRAMER
+    elif _CTOR_MODE == "method":
+        kwargs["method"] = "rtu"
+    return functools.partial(ModbusSerialClient, **kwargs)
+
+def _silent_interval(link: Link) -> float:
+    """Modbus RTU inter-frame silence for the link, in seconds (none over TCP)."""
+    if isinstance(link, TcpLink):
+        return 0.0
+    if link.baudrate > 19200:
+        return 0.00175
+    return 3.5 * _char_time(link)
+
+def _char_time(link: LinkConfig) -> float:
+    """Time on the wire of one RTU character (start + data + parity + stop bits), in seconds."""
+    char_bits = 1 + link.bytesize + (0 if str(link.parity).upper() == "N" else 1) + link.stopbits
+    return char_bits / link.baudrate
 
-    def _make_client(self) -> ModbusSerialClient:
-        kwargs = dict(
-            port=self.link.port,
-            baudrate=self.link.baudrate,
-            parity=self.link.parity,
-            stopbits=self.link.stopbits,
-            bytesize=self.link.bytesize,
-            timeout=self.link.timeout,
-        )
-        # Prefer new-style framer if available
-        RTUFramer = None
+# fast_rtu: cap pymodbus' fixed receive poll sleep at ~4 chars and set a 3.5-char
+# inter-byte timeout on the port; both only where this pymodbus/pyserial has them
+def _tune_rtu(cli: Any, link: LinkConfig) -> None:
+    if link.fast_rtu:
+        interval = max(0.001, 40.0 / link.baudrate)
+        for obj in (cli, getattr(cli, "framer", None)):
+            if obj is not None and hasattr(obj, "_recv_interval"):
+                try:
+                    obj._recv_interval = interval
+                except Exception:
+                    pass
+    ibt = link.inter_byte_timeout
+    if ibt is None and link.fast_rtu:
+        ibt = 3.5 * _char_time(link)
+    sock = getattr(cli, "socket", None)
+    if ibt is not None and sock is not None and hasattr(sock, "inter_byte_timeout"):
         try:
-            from pymodbus.framer.rtu_framer import ModbusRtuFramer as RTUFramer  # newer
+            sock.inter_byte_timeout = ibt
         except Exception:
+            pass
+
+# TCP_NODELAY: Nagle plus delayed ACK would hold each small request back ~40 ms
+def _tune_tcp(cli: Any) -> None:
+    sock = getattr(cli, "socket", None)
+    if sock is None:
+        sock = getattr(getattr(cli, "transport", None), "get_extra_info", lambda _n: None)("socket")
+    if sock is not None and hasattr(sock, "setsockopt"):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            pass
+
+# One Modbus client shared by every unit on a bus: opened lazily, kept open until close();
+# transport errors drop it (reads retry once), requests are spaced by the RTU silence
+class BusClient:
+
+    def __init__(self, link: Link, open_error: Optional[str] = None):
+        self.link = link
+        if open_error is None:
+            open_error = (f"Connessione TCP fallita verso {link.host}:{link.port}"
+                          if isinstance(link, TcpLink) else "Impossibile aprire la porta seriale")
+        self._open_error = open_error
+        self._client_ctor = _client_factory(link)
+        self._client: Optional[Any] = None
+        self._calls: Dict[Tuple[str, int], Callable[..., Any]] = {}  # (method, unit) -> bound call
+        self._silent = _silent_interval(link)
+        self._last_tx = 0.0
+        # fast_rtu: per-request reply timeout sized to the expected reply (0 = keep link.timeout)
+        self._char = _char_time(link) if isinstance(link, LinkConfig) and link.fast_rtu else 0.0
+        self._timeout_set: Optional[float] = None  # reply timeout last applied to the client
+
+    def __enter__(self):
+        self._connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _make_client(self):
+        return self._client_ctor()
+
+    def _connect(self):
+        if self._client is None:
+            cli = self._make_client()
+            if not cli.connect():
+                raise RuntimeError(self._open_error)
+            if isinstance(self.link, LinkConfig):
+                _tune_rtu(cli, self.link)
+            else:
+                _tune_tcp(cli)
+            self._client = cli
+        return self._client
+
+    def _invalidate(self) -> None:
+        """Drop the client after a transport failure; the next request reopens it."""
+        cli, self._client = self._client, None
+        self._calls.clear()
+        self._timeout_set = None
+        if cli is not None:
             try:
-                from pymodbus.framer.rtu import ModbusRtuFramer as RTUFramer      # older 3.x
+                cli.close()
             except Exception:
-                RTUFramer = None
-        # Try modern constructor
-        if RTUFramer is not None:
-            try:
-                return ModbusSerialClient(framer=RTUFramer, **kwargs)
-            except TypeError:
                 pass
-        # Fallback to legacy method="rtu"
-        try:
-            return ModbusSerialClient(method="rtu", **kwargs)
-        except TypeError:
-            # Last resort: no framer/method argument accepted
-            return ModbusSerialClient(**kwargs)
+
+    def close(self) -> None:
+        self._invalidate()
+
+    def _bound(self, method: str, unit: int) -> Callable[..., Any]:
+        fn = self._calls.get((method, unit))
+        if fn is None:
+            fn = _bind_unit(getattr(self._connect(), method), unit)
+            if _UNIT_KW is not None:
+                self._calls[(method, unit)] = fn
+        return fn
+
+    def _reply_timeout(self, reply_bytes: int) -> None:
+        # pymodbus 3.7+ waits for the reply on comm_params.timeout_connect; older ones on the
+        # port timeout. Only set on change: the pyserial setter reconfigures the port (tcsetattr).
+        timeout = min(self.link.timeout, max(0.05, reply_bytes * self._char + 0.02))
+        if timeout == self._timeout_set:
+            return
+        cli = self._client
+        params = getattr(cli, "comm_params", None)
+        target, attr = (params, "timeout_connect") if hasattr(params, "timeout_connect") else (getattr(cli, "socket", None), "timeout")
+        if target is not None and hasattr(target, attr):
+            try:
+                setattr(target, attr, timeout)
+            except Exception:
+                return
+            self._timeout_set = timeout
+
+    def _execute(self, method: str, unit: int, retry: bool = True, reply_bytes: int = 0, **kwargs: Any):
+        # Two failure classes, handled at different layers:
+        # - transport (ConnectionException/OSError: port or socket gone): the client is dropped
+        #   and the request retried once on a fresh one, as only a reconnect can fix it;
+        # - the unit's (any other ModbusException, e.g. ModbusIOException when nobody answers):
+        #   re-raised on the same client, the port is fine and reopening it would not wake a
+        #   dead unit; read_fields() turns it into NaN for that block's fields
+        for attempt in range(2 if retry else 1):
+            fn = self._bound(method, unit)
+            if self._char and reply_bytes:
+                self._reply_timeout(reply_bytes)
+            wait = self._silent - (time.monotonic() - self._last_tx)
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                return fn(**kwargs)
+            except (ConnectionException, OSError):
+                self._invalidate()
+                if not retry or attempt:
+                    raise
+            except ModbusException:
+                raise
+            except Exception:
+                self._invalidate()
+                raise
+            finally:
+                self._last_tx = time.monotonic()
+
+    def read_input(self, address: int, count: int, unit: int):
+        return self._execute("read_input_registers", unit, reply_bytes=5 + 2 * count, address=address, count=count)
+
+    def read_holding(self, address: int, count: int, unit: int):
+        return self._execute("read_holding_registers", unit, reply_bytes=5 + 2 * count, address=address, count=count)
+
+    def write(self, address: int, values: list[int], unit: int):
+        # not retried: the first attempt may have reached the unit
+        return self._execute("write_registers", unit, retry=False, reply_bytes=8, address=address, values=values)
+
+
+class _ModbusMeter:
+    """Driver base: a unit id on a BusClient (a private one on ``link`` when no ``bus`` is shared)."""
+
+    _open_error = "Impossibile aprire la porta seriale"
+
+    def __init__(self, link: Link, unit: int = 1, bus: Optional[BusClient] = None):
+        self.link = link
+        self.unit = int(unit)
+        self._owns_bus = bus is None
+        if bus is None:
+            bus = BusClient(link, open_error=self._open_error if isinstance(link, LinkConfig) else None)
+        self.bus = bus
+
+    def __enter__(self):
+        self.bus._connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        if self._owns_bus:
+            self.bus.close()
+
+    # Driver layout: measurement name -> input register, and the merge tolerance
+    INPUT_MAP: Dict[str, int] = {}
+    MAX_READ_GAP = 0
+
+    @classmethod
+    def _read_groups(cls, names: Tuple[str, ...]) -> list[Tuple[int, int, Dict[str, int]]]:
+        """(start, count, {field: offset}) requests covering ``names``, planned once per field set."""
+        key = (cls, names)
+        plan = _READ_GROUPS.get(key)
+        if plan is None:
+            ranges, where = _plan_ranges(((cls.INPUT_MAP[n], 2) for n in names), max_gap=cls.MAX_READ_GAP)
+            plan = [(start, count, {}) for start, count in ranges]
+            for name in names:
+                idx, off = where[cls.INPUT_MAP[name]]
+                plan[idx][2][name] = off
+            _READ_GROUPS[key] = plan
+        return plan
+
+    def read_fields(self, names) -> Dict[str, float]:
+        """Named measurements in the fewest requests; a failed block is NaN, connection errors propagate."""
+        vals: Dict[str, float] = {}
+        for start, count, fields in self._read_groups(tuple(names)):
+            try:
+                rr = self.bus.read_input(start, count, self.unit)
+            except ConnectionException:
+                raise
+            except ModbusException:
+                vals.update(dict.fromkeys(fields, float("nan")))
+                continue
+            if hasattr(rr, "isError") and rr.isError():
+                vals.update(dict.fromkeys(fields, float("nan")))
+                continue
+            vals.update(_decode_block(rr.registers, fields))
+        return vals
+
+    # Holding params: name -> register (float pair); read in this order
+    PARAM_MAP: Dict[str, int] = {}
+
+    def _read_param_values(self, fields=None) -> Dict[str, float]:
+        """Raw PARAM_MAP values; with ``fields`` only those are read (the others are NaN)."""
+        vals: Dict[str, float] = {}
+        for name, addr in self.PARAM_MAP.items():
+            if fields is not None and name not in fields:
+                vals[name] = float("nan")
+                continue
+            rr = self.bus.read_holding(addr, 2, self.unit)
+            if rr.isError():
+                raise ModbusException(rr)
+            vals[name] = _registers_to_float((rr.registers[0], rr.registers[1]))
+        return vals
+
+
+class DDS661(_ModbusMeter):
 
     # ---- params ----
-    def read_params(self) -> Params:
-        cli = self._make_client()
-        if not cli.connect():
-            raise RuntimeError("Impossibile aprire la porta seriale")
-        try:
-            def _r(addr: int) -> float:
-                rr = _call_with_unit(cli.read_holding_registers, address=addr, count=2, unit_id=self.unit)
-                if rr.isError():
-                    raise ModbusException(rr)
-                return _registers_to_float((rr.registers[0], rr.registers[1]))
-            return Params(
-                baud=_r(REG_BAUD),
-                parity=_r(REG_PARITY),
-                slave=_r(REG_SLAVE),
-            )
-        finally:
-            cli.close()
+    PARAM_MAP = {"baud": REG_BAUD, "parity": REG_PARITY, "slave": REG_SLAVE}
+
+    def read_params(self, fields=None) -> Params:
+        """Read the holding params; with ``fields`` only those are read (the others are NaN)."""
+        return Params(**self._read_param_values(fields))
 
     def write_params(self, baud: Optional[float] = None,
                      parity: Optional[float] = None,
                      slave: Optional[float] = None) -> Dict[str, str]:
-        cur = self.read_params()
         plan = [("slave", REG_SLAVE, slave), ("parity", REG_PARITY, parity), ("baud", REG_BAUD, baud)]
-
-        cli = self._make_client()
-        if not cli.connect():
-            raise RuntimeError("Impossibile aprire la porta seriale")
+        # pre-read only what is going to be compared/written
+        needed = [name for name, _, desired in plan if desired is not None]
+        cur = self.read_params(needed) if needed else None
 
         report: Dict[str, str] = {}
-        try:
-            for name, addr, desired in plan:
-                if desired is None:
-                    report[name] = "skipped (None)"
-                    continue
-                cur_val = getattr(cur, name)
-                if abs(cur_val - float(desired)) < 1e-6:
-                    report[name] = f"unchanged ({desired})"
-                    continue
-                hi, lo = _float_to_registers(float(desired))
-                rq = _write_with_unit(cli.write_registers, address=addr, values=[hi, lo], unit_id=self.unit)
-                if rq.isError():
-                    report[name] = f"ERROR: {rq}"
-                else:
-                    report[name] = f"written ({desired})"
-                    if name == "slave":
-                        self.unit = int(desired)
-            return report
-        finally:
-            cli.close()
+        for name, addr, desired in plan:
+            if desired is None:
+                report[name] = "skipped (None)"
+                continue
+            cur_val = getattr(cur, name)
+            if abs(cur_val - float(desired)) < 1e-6:
+                report[name] = f"unchanged ({desired})"
+                continue
+            hi, lo = _float_to_registers(float(desired))
+            rq = self.bus.write(addr, [hi, lo], self.unit)
+            if rq.isError():
+                report[name] = f"ERROR: {rq}"
+            else:
+                report[name] = f"written ({desired})"
+                if name == "slave":
+                    self.unit = int(desired)
+        return report
 
     # ---- measurements ----
+    INPUT_MAP = INPUT_MAP
+    MAX_READ_GAP = MAX_READ_GAP
+
     def read_measurements(self) -> Measurements:
-        cli = self._make_client()
-        if not cli.connect():
-            raise RuntimeError("Impossibile aprire la porta seriale")
-        try:
-            def _rin(addr: int) -> float:
-                rr = _call_with_unit(cli.read_input_registers, address=addr, count=2, unit_id=self.unit)
-                if rr.isError():
-                    return float("nan")
-                return _registers_to_float((rr.registers[0], rr.registers[1]))
-            return Measurements(
-                voltage=_rin(IN_VOLTAGE),
-                current=_rin(IN_CURRENT),
-                p_active=_rin(IN_P_ACT),
-                pf=_rin(IN_PF),
-                freq=_rin(IN_FREQ),
-                e_total=_rin(IN_E_TOT),
-                e_pos=_rin(IN_E_POS),
-                e_rev=_rin(IN_E_REV),
-            )
-        finally:
-            cli.close()
+        return Measurements(**self.read_fields(MEAS_FIELDS))
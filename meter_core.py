@@ -0,0 +1,223 @@
+"""
+meter_core.py
+-------------
+Config and link helpers shared by meter.py (CLI) and polling.py (MQTT poller):
+config loading (YAML/JSON, cached), serial/TCP link building, device lookup by
+unit id, TCP settings merge and the driver table.
+
+Nothing here imports yaml or pymodbus at module load; both are pulled in on
+first use, so the CLI's --help/argument errors and cached configs stay cheap.
+"""
+from __future__ import annotations
+
+import copy, functools, importlib, json, os, stat
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# ------------------------------- Config -------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def _yaml_loader():
+    try:
+        import yaml
+    except Exception:
+        raise SystemExit("ERROR: PyYAML not installed. Install with: pip install pyyaml")
+    return yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Parsed configs keyed by absolute path; an entry is valid while (mtime_ns, size) match.
+# The flag marks a cfg that came from the sidecar (no _SIDECAR_SKIP sections)
+_CONFIG_CACHE: "OrderedDict[str, Tuple[int, int, dict, bool]]" = OrderedDict()
+_CONFIG_CACHE_MAX = 32
+
+# JSON sidecar (<config>.cache.json) for configs big enough for the YAML parse to matter;
+# it records the YAML's size and mtime_ns and is only used while both match exactly
+_SIDECAR_MIN_SIZE = 2048
+# left out of the sidecar: the broker credentials stay in the YAML only (meter.py never reads them)
+_SIDECAR_SKIP = ("mqtt",)
+
+def _read_sidecar(path: str, st: os.stat_result) -> Optional[dict]:
+    try:
+        with open(path + ".cache.json", "rb") as f:
+            side = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(side, dict) or side.get("size") != st.st_size
+            or side.get("mtime_ns") != st.st_mtime_ns or not isinstance(side.get("cfg"), dict)):
+        return None
+    return side["cfg"]
+
+def _write_sidecar(path: str, st: os.stat_result, cfg: dict) -> None:
+    side = path + ".cache.json"
+    tmp = f"{side}.{os.getpid()}.tmp"
+    try:
+        cfg = {k: v for k, v in cfg.items() if k not in _SIDECAR_SKIP}
+        data = json.dumps({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "cfg": cfg}, separators=(",", ":"))
+        if json.loads(data)["cfg"] != cfg:
+            return  # not JSON round-trippable (dates, non-string keys...)
+        # created with the YAML's permissions, never wider
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, stat.S_IMODE(st.st_mode))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, side)
+    except (OSError, TypeError, ValueError):
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+def _parse_config(data: bytes) -> Tuple[dict, bool]:
+    """Parse a config file's bytes; returns (cfg, was_json).
+
+    A document starting with '{' is tried as JSON first (JSON configs skip
+    yaml entirely); YAML flow mappings that are not valid JSON fall through.
+    """
+    if data.lstrip()[:1] == b"{":
+        try:
+            return json.loads(data), True
+        except ValueError:
+            pass
+    yaml, loader = _yaml_loader()
+    return yaml.load(data, Loader=loader) or {}, False
+
+def load_config(path: str, use_cache: bool = True) -> dict:
+    """Parsed config (a fresh copy per call).
+
+    Repeat loads of an unchanged file come from an in-process cache; with
+    use_cache, configs of at least 2 KiB also keep a JSON sidecar for later runs
+    (without the `mqtt:` section, so such loads may lack it).
+    """
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    hit = _CONFIG_CACHE.get(key)
+    if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size and (use_cache or not hit[3]):
+        _CONFIG_CACHE.move_to_end(key)
+        cfg = hit[2]
+    else:
+        sidecar = use_cache and st.st_size >= _SIDECAR_MIN_SIZE
+        cfg = _read_sidecar(key, st) if sidecar else None
+        partial = cfg is not None
+        if cfg is None:
+            with open(key, "rb") as f:
+                cfg, is_json = _parse_config(f.read())
+            if sidecar and not is_json:
+                _write_sidecar(key, st, cfg)
+        _CONFIG_CACHE[key] = (st.st_mtime_ns, st.st_size, cfg, partial)
+        _CONFIG_CACHE.move_to_end(key)
+        while len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX:
+            _CONFIG_CACHE.popitem(last=False)
+    # callers may mutate their copy
+    return copy.deepcopy(cfg)
+
+# ------------------------------- Serial links --------------------------------
+
+# LinkConfig field -> coercion for values coming from config or CLI
+_LINK_TYPES = {
+    "port": str,
+    "baudrate": int,
+    "parity": lambda v: str(v).upper()[:1],
+    "stopbits": int,
+    "bytesize": int,
+    "timeout": float,
+    "fast_rtu": bool,
+    "inter_byte_timeout": float,
+}
+LINK_KEYS = tuple(_LINK_TYPES)
+
+def build_link(block: Optional[Dict[str, Any]], overrides: Optional[Dict[str, Any]] = None):
+    """LinkConfig from a serial block, with non-None overrides (CLI flags) on top."""
+    from dds661 import LinkConfig
+    kw = {k: v for k, v in (block or {}).items() if k in _LINK_TYPES and v is not None}
+    if overrides:
+        kw.update((k, v) for k, v in overrides.items() if k in _LINK_TYPES and v is not None)
+    return LinkConfig(**{k: _LINK_TYPES[k](v) for k, v in kw.items()})
+
+def serial_blocks(cfg: Optional[dict]) -> List[Dict[str, Any]]:
+    """`serial:` as a list of blocks (it may be one mapping or a list of them)."""
+    s = cfg.get("serial") if isinstance(cfg, dict) else None
+    if isinstance(s, list):
+        return [b for b in s if isinstance(b, dict)]
+    return [s] if isinstance(s, dict) else [{}]
+
+def bus_name(block: Dict[str, Any]) -> str:
+    """Bus name of a serial block (`name:`, else the port)."""
+    return str(block.get("name") or block.get("port") or build_link(block).port)
+
+def find_serial(cfg: Optional[dict], bus: Any = None) -> Optional[Dict[str, Any]]:
+    """Serial block for a device's `bus:` (name or port); the first one when unset, None when unknown."""
+    blocks = serial_blocks(cfg)
+    if bus is None:
+        return blocks[0]
+    key = str(bus)
+    for b in blocks:
+        if key in (bus_name(b), str(b.get("port") or build_link(b).port)):
+            return b
+    return None
+
+def select_serial(cfg: Optional[dict], bus: Any = None) -> Dict[str, Any]:
+    """Like find_serial(), but an unknown `bus:` falls back to the first block."""
+    b = find_serial(cfg, bus)
+    return b if b is not None else serial_blocks(cfg)[0]
+
+# ------------------------------- Devices ------------------------------------
+
+def unit_id(v: Any) -> Optional[int]:
+    """Config 'id' as an int (10, "10", 10.0), else None."""
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, int):
+        return v
+    if isinstance(v, float):
+        return int(v) if v.is_integer() else None
+    if isinstance(v, str) and v.strip().isdigit():
+        return int(v)
+    return None
+
+# (cfg, {unit id: device entry}) for the last config seen; rebuilt when a different dict comes in
+_DEV_INDEX: Tuple[Optional[dict], Dict[int, dict]] = (None, {})
+
+def device_index(cfg: dict) -> Dict[int, dict]:
+    global _DEV_INDEX
+    if _DEV_INDEX[0] is not cfg:
+        idx: Dict[int, dict] = {}
+        for d in (cfg.get("devices") or []):
+            uid = unit_id(d.get("id")) if isinstance(d, dict) else None
+            if uid is not None:
+                idx.setdefault(uid, d)  # first entry wins
+        _DEV_INDEX = (cfg, idx)
+    return _DEV_INDEX[1]
+
+def device_entry(cfg: Optional[dict], unit: Optional[int]) -> Dict[str, Any]:
+    if not isinstance(cfg, dict) or unit is None:
+        return {}
+    return device_index(cfg).get(unit, {})
+
+def tcp_settings(cfg: Optional[dict], dev: Optional[Dict[str, Any]] = None,
+                 host: Optional[str] = None, port: Optional[int] = None) -> Dict[str, Any]:
+    """Global `tcp:` merged with the device's `tcp:`, then host/port overrides, then defaults."""
+    out = dict((cfg.get("tcp") or {}) if isinstance(cfg, dict) else {})
+    out.update((dev.get("tcp") or {}) if isinstance(dev, dict) else {})
+    if host: out["host"] = host
+    if port: out["port"] = port
+    out.setdefault("host", "192.168.0.99")
+    out.setdefault("port", 502)
+    out.setdefault("timeout", 1.0)
+    return out
+
+def build_tcp_link(tcp: Optional[Dict[str, Any]]):
+    """TcpLink from tcp_settings() output (missing keys take the same defaults)."""
+    from dds661 import TcpLink
+    t = tcp or {}
+    return TcpLink(host=str(t.get("host", "192.168.0.99")), port=int(t.get("port", 502)),
+                   timeout=float(t.get("timeout", 1.0)))
+
+# ------------------------------- Drivers ------------------------------------
+
+# type -> (module, class); imported on first use
+DRIVER_TABLE = {
+    "dds661": ("dds661", "DDS661"),
+    "sdm230": ("sdm230", "SDM230"),
+}
+
+def driver_class(dev_type: str):
+    mod, cls = DRIVER_TABLE[dev_type]
+    return getattr(importlib.import_module(mod), cls)
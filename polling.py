@@ -14,6 +14,10 @@ serial:
   stopbits: 1
   bytesize: 8
   timeout: 1.0
+# or several RS-485 adapters, polled in parallel (devices pick one with `bus:`):
+# serial:
+#   - {name: bus1, port: /dev/ttyUSB0, baudrate: 9600, parity: E}
+#   - {name: bus2, port: /dev/ttyUSB1, baudrate: 9600, parity: N}
 
 mqtt:
   host: 127.0.0.1
@@ -31,11 +35,17 @@ home_assistant:
   area: "Lab"
 
 polling:
-  read_mode: sequential      # or "bulk"
-  per_measure_delay_ms: 50
+  read_mode: bulk            # or "sequential"
+  per_measure_delay_ms: 0    # extra pause on top of the RTU 3.5-char silence
   delay_ms_between_devices: 0
   period_s: 5
+  heartbeat_cycles: 60       # re-publish unchanged devices every N cycles (0 = every cycle)
+  change_rel_tol: 0.0001
   debug_log: false
+  fields:                    # optional per-field scan interval (default: every cycle)
+    e_total: {interval_s: 60}
+    e_pos: {interval_s: 60}
+    e_rev: {interval_s: 60}
 
 devices:
   - id: 1
@@ -44,131 +54,150 @@ devices:
   - id: 5
     type: sdm230
     name: "PV Import/Export"
+    fields:                  # optional per-device override of polling.fields
+      e_total: {interval_s: 300}
 """
 
 from __future__ import annotations
 
 import argparse
 import errno
+import functools
 import json
 import logging
+import math
+import re
 import socket
 import signal
 import sys
 import threading
 import time
-from dataclasses import asdict
-from typing import Any, Dict, Optional, Tuple, List
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple, List
 
-import yaml
 import paho.mqtt.client as mqtt
 
-# TCP client import (pymodbus 3.x then 2.x fallback)
+# Optional fast JSON encoder (falls back to stdlib json)
 try:
-    from pymodbus.client import ModbusTcpClient
-except Exception:
-    try:
-        from pymodbus.client.sync import ModbusTcpClient  # type: ignore
-    except Exception:
-        ModbusTcpClient = None  # type: ignore
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
 
 
 # ---- import driver libs and helpers
-from dds661 import (
-    DDS661, LinkConfig,
-    _call_with_unit, _registers_to_float,
-    IN_VOLTAGE as D_VOLT, IN_CURRENT as D_CURR, IN_P_ACT as D_PACT,
-    IN_PF as D_PF, IN_FREQ as D_FREQ, IN_E_TOT as D_ETOT, IN_E_POS as D_EPOS, IN_E_REV as D_EREV,
-)
-from sdm230 import (
-    SDM230,
-    IN_VOLTAGE as S_VOLT, IN_CURRENT as S_CURR, IN_P_ACT as S_PACT,
-    IN_PF as S_PF, IN_FREQ as S_FREQ, IN_E_TOT as S_ETOT, IN_E_POS as S_EPOS, IN_E_REV as S_EREV,
+from dds661 import LinkConfig, TcpLink, BusClient, MEAS_FIELDS, _registers_to_float
+from meter_core import (
+    DRIVER_TABLE, bus_name, build_link, build_tcp_link, driver_class, find_serial,
+    load_config, serial_blocks, tcp_settings,
 )
 
 log = logging.getLogger("meters.poller")
 
-MEAS_KEYS = ("voltage", "current", "p_active", "pf", "freq", "e_total", "e_pos", "e_rev")
-
-# For sequential reads we need address maps per driver
-ADDR_MAP = {
-    "dds661": {
-        "voltage": D_VOLT, "current": D_CURR, "p_active": D_PACT, "pf": D_PF, "freq": D_FREQ,
-        "e_total": D_ETOT, "e_pos": D_EPOS, "e_rev": D_EREV,
-    },
-    "sdm230": {
-        "voltage": S_VOLT, "current": S_CURR, "p_active": S_PACT, "pf": S_PF, "freq": S_FREQ,
-        "e_total": S_ETOT, "e_pos": S_EPOS, "e_rev": S_EREV,
-    },
-}
-
-DRIVERS = {
-    "dds661": DDS661,
-    "sdm230": SDM230,
-}
+_NAN = float("nan")
+
+_SLUG_NONALNUM = re.compile(r"[^a-z0-9]+")
+_SLUG_DUP = re.compile(r"-{2,}")
 
 def _slugify_name(name: str) -> str:
-    import re, unicodedata
     if not name:
         return ""
     s = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
-    s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-{2,}", "-", s).strip("-")
-    return s
+    s = _SLUG_NONALNUM.sub("-", s.strip().lower())
+    return _SLUG_DUP.sub("-", s).strip("-")
 
+@functools.lru_cache(maxsize=256)
 def _topic_key(name: Optional[str], unit_id: int) -> str:
     slug = _slugify_name(name or "")
     return slug if slug else str(unit_id)
 
-# ------------------------------- YAML ---------------------------------------
+# ------------------------------- JSON ---------------------------------------
+
+def _json_bytes(obj: Any) -> bytes:
+    """Compact UTF-8 JSON for MQTT payloads (paho publishes bytes as-is)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
 
-def _load_yaml(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+def _json_pretty(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2)
 
 # ------------------------------- MQTT ---------------------------------------
 
+# Set on every (re)connect: the next cycle publishes all devices, not only the changed ones
+_republish_evt = threading.Event()
+# Set by the first successful connect; before it, is_connected() is False only because the CONNACK is pending
+_connected_once = threading.Event()
+
+def _paho_major() -> int:
+    try:
+        import paho.mqtt as paho_mod
+        ver_str = getattr(paho_mod, "__version__", "2.0.0")
+        return int(str(ver_str).split(".")[0])
+    except Exception:
+        return 2
+
+def _v2_client(client_id: str, base_topic: str, qos: int, clean_session: bool = True) -> mqtt.Client:
+    client = mqtt.Client(
+        callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+        client_id=client_id,
+        clean_session=clean_session,
+        protocol=mqtt.MQTTv311,
+        transport="tcp",
+    )
+    def on_connect(cli, userdata, flags, reason_code, properties=None):
+        code = getattr(reason_code, "value", reason_code)
+        if code == 0:
+            log.info("Connected to MQTT broker")
+            cli.publish(f"{base_topic}/status", payload="online", qos=qos, retain=True)
+            _republish_evt.set()
+            _connected_once.set()
+        else:
+            log.error("MQTT connect failed rc=%s", reason_code)
+    client.on_connect = on_connect
+    return client
+
+def _v1_client(client_id: str, base_topic: str, qos: int, clean_session: bool = True) -> mqtt.Client:
+    client = mqtt.Client(client_id=client_id, clean_session=clean_session)
+    def on_connect(cli, userdata, flags, rc):
+        if int(rc) == 0:
+            log.info("Connected to MQTT broker")
+            cli.publish(f"{base_topic}/status", payload="online", qos=qos, retain=True)
+            _republish_evt.set()
+            _connected_once.set()
+        else:
+            log.error("MQTT connect failed rc=%s", rc)
+    client.on_connect = on_connect
+    return client
+
+# paho 1.x/2.x differ in constructor and on_connect signature; resolved once at import
+_PAHO_MAJOR = _paho_major()
+_CLIENT_FACTORY = _v2_client if _PAHO_MAJOR >= 2 else _v1_client
+
 def _mqtt_client(cfg: Dict[str, Any]) -> mqtt.Client:
     m = cfg.get("mqtt", {}) if isinstance(cfg, dict) else {}
     client_id = m.get("client_id", "meters-poller")
     base_topic = m.get("base_topic", "energy")
     qos = int(m.get("qos", 0))
 
-    try:
-        import paho.mqtt as paho_mod
-        ver_str = getattr(paho_mod, "__version__", "2.0.0")
-        major = int(str(ver_str).split(".")[0])
-    except Exception:
-        major = 2
-
-    if major >= 2:
-        client = mqtt.Client(
-            callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
-            client_id=client_id,
-            protocol=mqtt.MQTTv311,
-            transport="tcp",
-        )
-        def on_connect(cli, userdata, flags, reason_code, properties=None):
-            code = getattr(reason_code, "value", reason_code)
-            if code == 0:
-                log.info("Connected to MQTT broker")
-                cli.publish(f"{base_topic}/status", payload="online", qos=qos, retain=True)
-            else:
-                log.error("MQTT connect failed rc=%s", reason_code)
-        client.on_connect = on_connect
-    else:
-        client = mqtt.Client(client_id=client_id, clean_session=True)
-        def on_connect(cli, userdata, flags, rc):
-            if int(rc) == 0:
-                log.info("Connected to MQTT broker")
-                cli.publish(f"{base_topic}/status", payload="online", qos=qos, retain=True)
-            else:
-                log.error("MQTT connect failed rc=%s", rc)
-        client.on_connect = on_connect
+    # QoS>0 defaults to a persistent session, so in-flight messages survive a reconnect
+    clean_session = bool(m.get("clean_session", qos == 0))
+
+    client = _CLIENT_FACTORY(client_id, base_topic, qos, clean_session)
 
     client.will_set(f"{base_topic}/status", payload="offline", qos=qos, retain=True)
 
+    # paho's own reconnect (loop_start thread) backs off between these bounds; while
+    # disconnected at most max_queued_messages are held instead of an unbounded backlog
+    client.reconnect_delay_set(
+        min_delay=max(1, int(m.get("reconnect_min_delay_s", 1))),
+        max_delay=max(1, int(m.get("reconnect_max_delay_s", 30))),
+    )
+    client.max_queued_messages_set(int(m.get("max_queued_messages", 1024)))
+
     if m.get("username"):
         client.username_pw_set(m["username"], m.get("password") or None)
 
@@ -238,6 +267,34 @@ def _mqtt_connect(client: mqtt.Client, cfg: Dict[str, Any]) -> None:
         log.warning("Retrying MQTT connect in %.1fs...", retry_delay_s)
         time.sleep(retry_delay_s)
 
+def _publish_batch(client: mqtt.Client, msgs: Sequence[Tuple[str, bytes, int, bool]], timeout: float) -> None:
+    """Publish (topic, payload, qos, retain) back to back, then wait for the QoS>0 acks.
+
+    One barrier for the whole batch: the acks overlap instead of being awaited one
+    by one, and the wait is bounded by ``timeout`` seconds in total.
+    """
+    pending = []  # QoS>0 messages still waiting for the broker's ack
+    for topic, payload, qos, retain in msgs:
+        try:
+            info = client.publish(topic, payload, qos=qos, retain=retain)
+        except Exception as e:
+            log.error("Publish failed for %s: %s", topic, e)
+            continue
+        if getattr(info, "rc", 0):
+            log.warning("Publish for %s not queued (rc=%s)", topic, info.rc)
+        elif qos > 0:
+            pending.append((topic, info))
+
+    deadline = time.monotonic() + timeout
+    for topic, info in pending:
+        try:
+            info.wait_for_publish(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception as e:
+            log.warning("Publish for %s not confirmed: %s", topic, e)
+            continue
+        if not info.is_published():
+            log.warning("Publish for %s not confirmed within %.1fs", topic, timeout)
+
 # ------------------------------- Topic Helpers -------------------------------
 
 def _device_topic(base_topic: str, dev_name: str, cfg: Dict[str, Any]) -> str:
@@ -253,6 +310,9 @@ def _device_topic(base_topic: str, dev_name: str, cfg: Dict[str, Any]) -> str:
 
 # ------------------------------- HA Discovery -------------------------------
 
+# Bound on the wait for the discovery configs' acks (QoS>0) at startup
+_DISCOVERY_ACK_TIMEOUT_S = 5.0
+
 def _ha_device(unique: str, name: str, area: Optional[str], model: str, manufacturer: str) -> Dict[str, Any]:
     dev = {
         "identifiers": [unique],
@@ -264,15 +324,14 @@ def _ha_device(unique: str, name: str, area: Optional[str], model: str, manufact
         dev["area"] = area
     return dev
 
-def _ha_publish_discovery(client: mqtt.Client, cfg: Dict[str, Any]) -> None:
+def _ha_publish_discovery(client: mqtt.Client, cfg: Dict[str, Any], devices: Sequence[DeviceCtx]) -> None:
+    # built from the validated device contexts: entries _device_contexts() skipped get no sensors
     ha = (cfg.get("home_assistant") or {}) if isinstance(cfg, dict) else {}
     if not ha or not ha.get("enabled"):
         return
 
     m = cfg.get("mqtt", {}) if isinstance(cfg, dict) else {}
     base_topic = m.get("base_topic", "energy")
-    qos = int(m.get("qos", 0))
-    retain = bool(m.get("retain", True))
     dprefix = ha.get("discovery_prefix", "homeassistant")
     area = ha.get("area")
 
@@ -287,18 +346,15 @@ def _ha_publish_discovery(client: mqtt.Client, cfg: Dict[str, Any]) -> None:
         ("e_rev", "Energy Export", "kWh", "energy"),
     ]
 
-    for d in cfg.get("devices", []):
-        unit_id = int(d["id"])
-        dev_type = str(d.get("type", "dds661")).lower()
-        name = d.get("name") or f"{dev_type.upper()} {unit_id}"
+    availability = [{"topic": f"{base_topic}/status"}]
+    msgs: List[Tuple[str, bytes, int, bool]] = []
+    for ctx in devices:
+        unit_id, dev_type, name = ctx.uid, ctx.dev_type, ctx.name
         unique_base = f"{dev_type}_{unit_id}"
         model = dev_type.upper()
         manufacturer = "DDS" if dev_type == "dds661" else "Eastron"
         device = _ha_device(unique_base, name, area, model, manufacturer)
 
-        state_topic = f"{base_topic}/{_topic_key(name, unit_id)}/state"
-        availability = {"topic": f"{base_topic}/status"}
-
         for key, label, unit, dev_class in sensors:
             comp = "sensor"
             unique_id = f"{unique_base}_{key}"
@@ -306,8 +362,8 @@ def _ha_publish_discovery(client: mqtt.Client, cfg: Dict[str, Any]) -> None:
             cfg_payload = {
                 "name": f"{name} {label}",
                 "uniq_id": unique_id,
-                "stat_t": state_topic,
-                "avty": [availability],
+                "stat_t": ctx.topic,
+                "avty": availability,
                 "val_tpl": f"{{{{ value_json.{key} | float }}}}",
                 "dev": device,
             }
@@ -317,106 +373,39 @@ def _ha_publish_discovery(client: mqtt.Client, cfg: Dict[str, Any]) -> None:
                 cfg_payload["dev_cla"] = dev_class
 
             topic = f"{dprefix}/{comp}/{obj_id}/config"
-            client.publish(topic, json.dumps(cfg_payload, ensure_ascii=False), qos=qos, retain=retain)
+            msgs.append((topic, _json_bytes(cfg_payload), ctx.qos, ctx.retain))
+
+    _publish_batch(client, msgs, _DISCOVERY_ACK_TIMEOUT_S)
 
 # ------------------------------- Serial Link --------------------------------
 
-def _make_link(cfg: Dict[str, Any]) -> LinkConfig:
-    s = cfg.get("serial", {}) if isinstance(cfg, dict) else {}
-    parity = str(s.get("parity", "E")).upper()[0]
-    return LinkConfig(
-        port=s.get("port", "/dev/ttyCOM1"),
-        baudrate=int(s.get("baudrate", 9600)),
-        parity=parity,
-        stopbits=int(s.get("stopbits", 1)),
-        bytesize=int(s.get("bytesize", 8)),
-        timeout=float(s.get("timeout", 1.0)),
-    )
-
-# ------------------------------- TCP config -----------------------------------
-def _tcp_merge(cfg: Dict[str, Any], dev: Dict[str, Any]) -> Dict[str, Any]:
-    g = (cfg.get("tcp") or {}) if isinstance(cfg, dict) else {}
-    d = (dev.get("tcp") or {}) if isinstance(dev, dict) else {}
-    out = dict(g)
-    out.update(d)
-    # defaults
-    out.setdefault("host", "192.168.0.99")
-    out.setdefault("port", 502)
-    out.setdefault("timeout", 1.0)
-    return out
+def _serial_links(cfg: Dict[str, Any]) -> Dict[str, LinkConfig]:
+    """Serial buses by name: `serial:` is one mapping or a list of them (`name:` defaults to the port)."""
+    return {bus_name(block): build_link(block) for block in serial_blocks(cfg)}
 
 # ------------------------------- Reading ------------------------------------
 
-def _read_device_bulk(dev_type: str, link: LinkConfig, unit_id: int) -> Dict[str, float]:
-    cls = DRIVERS[dev_type]
-    dev = cls(link, unit=unit_id)
-    meas = dev.read_measurements()
-    dct = asdict(meas)
-    return {k: float(dct.get(k, float("nan"))) for k in MEAS_KEYS}
-
-def _read_device_sequential(dev_type: str, link: LinkConfig, unit_id: int, per_measure_delay: float, step_log: bool=False, protocol: str='rtu', tcp: Dict[str, Any]|None=None) -> Dict[str, float]:
-    out: Dict[str, float] = {}
-    cls = DRIVERS[dev_type]
-    addrs = ADDR_MAP[dev_type]
-
-    # If TCP, reuse a single TCP client for the whole device pass (minimal change)
-    if str(protocol).lower() == "tcp":
-        if ModbusTcpClient is None:
-            raise RuntimeError("pymodbus ModbusTcpClient not available")
-        t = tcp or {}
-        cli = ModbusTcpClient(host=t.get("host","192.168.0.99"), port=int(t.get("port",502)), timeout=float(t.get("timeout",1.0)))
+def _read_device_bulk(dev_type: str, bus: BusClient, unit_id: int, fields: Sequence[str] = MEAS_FIELDS, meter: Any = None) -> Dict[str, float]:
+    dev = meter if meter is not None else driver_class(dev_type)(bus.link, unit=unit_id, bus=bus)
+    # read_fields() is what read_measurements() wraps; the Measurements object would only be unpacked again
+    dct = dev.read_fields(fields)
+    return {k: float(dct.get(k, _NAN)) for k in fields}
+
+def _read_device_sequential(dev_type: str, bus: BusClient, unit_id: int, per_measure_delay: float, step_log: bool=False, fields: Sequence[str] = MEAS_FIELDS) -> Dict[str, float]:
+    # one request per field on the device's bus (RS-485 or TCP gateway); a failed read only costs this field
+    label = f"{dev_type}/TCP" if isinstance(bus.link, TcpLink) else dev_type
+    # keys laid out up front in field order, all NaN until read
+    out: Dict[str, float] = dict.fromkeys(fields, _NAN)
+    addrs = driver_class(dev_type).INPUT_MAP
+    for name in fields:
+        val = _NAN
         try:
-            if not cli.connect():
-                raise RuntimeError("tcp connect failed")
-            for name in MEAS_KEYS:
-                addr = addrs[name]
-                val = float("nan")
-                try:
-                    rr = _call_with_unit(cli.read_input_registers, address=addr, count=2, unit_id=unit_id)
-                    if hasattr(rr, "isError") and rr.isError():
-                        val = float("nan")
-                    else:
-                        regs = (rr.registers[0], rr.registers[1])
-                        val = _registers_to_float(regs)
-                except Exception as e:
-                    log.error("Unit %s (%s/TCP) read '%s' failed: %s", unit_id, dev_type, name, e)
-                    val = float("nan")
-                out[name] = val
-                if step_log:
-                    log.info("read-step device=%s type=%s %s=%s", unit_id, dev_type, name, val)
-                if per_measure_delay > 0:
-                    time.sleep(per_measure_delay)
-        finally:
-            try:
-                cli.close()
-            except Exception:
-                pass
-        return out
-
-    # RTU path (unchanged semantics): fresh client per measurement
-    dummy = cls(link, unit=unit_id)  # just to reuse the client's transport config
-    for name in MEAS_KEYS:
-        addr = addrs[name]
-        cli = dummy._make_client()  # type: ignore[attr-defined]
-        val = float("nan")
-        try:
-            if not cli.connect():
-                raise RuntimeError("serial open failed")
-            rr = _call_with_unit(cli.read_input_registers, address=addr, count=2, unit_id=unit_id)
-            if hasattr(rr, "isError") and rr.isError():
-                val = float("nan")
-            else:
-                regs = (rr.registers[0], rr.registers[1])
-                val = _registers_to_float(regs)
+            rr = bus.read_input(addrs[name], 2, unit_id)
+            if not (hasattr(rr, "isError") and rr.isError()):
+                regs = rr.registers
+                val = out[name] = _registers_to_float((regs[0], regs[1]))
         except Exception as e:
-            log.error("Unit %s (%s) read '%s' failed: %s", unit_id, dev_type, name, e)
-            val = float("nan")
-        finally:
-            try:
-                cli.close()
-            except Exception:
-                pass
-        out[name] = val
+            log.error("Unit %s (%s) read '%s' failed: %s", unit_id, label, name, e)
         if step_log:
             log.info("read-step device=%s type=%s %s=%s", unit_id, dev_type, name, val)
         if per_measure_delay > 0:
@@ -430,75 +419,257 @@ _stop_evt = threading.Event()
 def _handle_sigterm(signum, frame):
     _stop_evt.set()
 
-def _poll_once(client: mqtt.Client, cfg: Dict[str, Any], link: LinkConfig) -> None:
+@dataclass
+class DeviceCtx:
+    """Per-device settings resolved once at startup (topic, publish args, bus, driver)."""
+    uid: int
+    dev_type: str
+    name: str
+    topic: str
+    qos: int
+    retain: bool
+    payload: Dict[str, Any]  # {"id", "type", "name"} skeleton, refreshed in place with the readings
+    bus: BusClient
+    tcp: Optional[Dict[str, Any]] = None
+    meter: Any = None  # driver instance on the device's bus, reused every cycle
+    intervals: Optional[Dict[str, float]] = None  # device 'fields:' merged over polling.fields; None = global
+    phase: float = 0.0  # 0..1: where in each slow field's interval this device's reads fall
+
+def _device_contexts(cfg: Dict[str, Any], buses: Dict[str, BusClient],
+                     tcp_buses: Optional[Dict[Tuple[str, int], BusClient]] = None) -> List[DeviceCtx]:
+    """Device contexts; TCP devices get a client from tcp_buses, one per gateway (host, port)."""
+    if tcp_buses is None:
+        tcp_buses = {}
     m = cfg.get("mqtt", {}) if isinstance(cfg, dict) else {}
     base_topic = m.get("base_topic", "energy")
     qos = int(m.get("qos", 0))
     retain = bool(m.get("retain", True))
 
     p = cfg.get("polling", {}) if isinstance(cfg, dict) else {}
-    mode = str(p.get("read_mode", "sequential")).lower()
-    per_measure_delay_ms = int(p.get("per_measure_delay_ms", 50))
-    per_measure_delay = max(0.0, per_measure_delay_ms / 1000.0)
-    debug_log = bool(p.get("debug_log", False))
-    delay_between_devices_ms = int(p.get("delay_ms_between_devices", 0))
-    delay_between_devices_s = max(0.0, delay_between_devices_ms / 1000.0)
 
-    devices = cfg.get("devices", [])
-    if not devices:
-        log.warning("No devices configured; nothing to poll.")
-        return
-
-    for d in devices:
+    out: List[DeviceCtx] = []
+    for d in (cfg.get("devices") or []):
         try:
             unit_id = int(d["id"])
             dev_type = str(d.get("type", "dds661")).lower()
             protocol = str(d.get("protocol","rtu")).lower()
-            if dev_type not in DRIVERS:
+            if dev_type not in DRIVER_TABLE:
                 log.error("Unsupported device type '%s' for id=%s", dev_type, unit_id)
                 continue
+            tcp = tcp_settings(cfg, d) if protocol == "tcp" else None
+            if tcp is not None:
+                link = build_tcp_link(tcp)
+                bus = tcp_buses.setdefault((link.host, link.port), BusClient(link))
+            else:
+                block = find_serial(cfg, d.get("bus"))
+                bus = buses.get(bus_name(block)) if block is not None else None
+            if bus is None:
+                log.error("Unknown bus '%s' for unit %s", d.get("bus"), unit_id)
+                continue
             name = d.get("name") or f"{dev_type.upper()} {unit_id}"
+            out.append(DeviceCtx(
+                uid=unit_id,
+                dev_type=dev_type,
+                name=name,
+                topic=f"{base_topic}/{_topic_key(name, unit_id)}/state",
+                qos=qos,
+                retain=retain,
+                payload={"id": unit_id, "type": dev_type, "name": name},
+                bus=bus,
+                tcp=tcp,
+                meter=driver_class(dev_type)(bus.link, unit=unit_id, bus=bus),
+                intervals=_field_intervals(p, d.get("fields")) if d.get("fields") else None,
+            ))
+        except Exception as e:
+            log.error("Invalid device entry %s: %s", d, e)
+    # Spread the devices over the slow fields' intervals, so that e.g. 60 s energy
+    # reads come round-robin instead of all devices in the same cycle
+    for i, ctx in enumerate(out):
+        ctx.phase = i / len(out)
+    return out
 
-            # If TCP is selected for this device, force the sequential/TCP path (minimal change)
-            if protocol == "tcp":
-                tcp = _tcp_merge(cfg, d)
-                vals = _read_device_sequential(dev_type, link, unit_id, per_measure_delay, step_log=debug_log, protocol="tcp", tcp=tcp)
-            else:
-                if mode == "bulk":
-                    vals = _read_device_bulk(dev_type, link, unit_id)
-                else:
-                    vals = _read_device_sequential(dev_type, link, unit_id, per_measure_delay, step_log=debug_log)
+@dataclass
+class _PollState:
+    """Loop state carried between _poll_once cycles (keys are (topic, field))."""
+    cycle: int = 0
+    last_published: Dict[Tuple[str, str], float] = field(default_factory=dict)
+    last_read_at: Dict[Tuple[str, str], float] = field(default_factory=dict)
+    last_values: Dict[Tuple[str, str], float] = field(default_factory=dict)
+
+def _field_intervals(p: Dict[str, Any], overrides: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+    fields_cfg = dict(p.get("fields") or {})
+    fields_cfg.update(overrides or {})
+    return {k: float((fields_cfg.get(k) or {}).get("interval_s", 0.0)) for k in MEAS_FIELDS}
+
+def _due_fields(state: _PollState, topic: str, intervals: Dict[str, float], now: float) -> List[str]:
+    due = []
+    for k in MEAS_FIELDS:
+        last = state.last_read_at.get((topic, k))
+        if last is None or now - last + 1e-3 >= intervals[k]:
+            due.append(k)
+    return due
+
+def _values_changed(vals: Dict[str, float], last: Dict[Tuple[str, str], float], topic: str, rel_tol: float) -> bool:
+    for key, val in vals.items():
+        prev = last.get((topic, key))
+        if prev is None:
+            return True
+        if math.isnan(val) and math.isnan(prev):
+            continue
+        if not math.isclose(val, prev, rel_tol=rel_tol):
+            return True
+    return False
+
+@dataclass(frozen=True, slots=True)
+class PollCfg:
+    """Polling settings parsed once from the 'polling:' block."""
+    period_s: float
+    mode: str
+    per_measure_delay: float
+    debug_log: bool
+    delay_between_devices: float
+    heartbeat_cycles: int
+    change_rel_tol: float
+    intervals: Dict[str, float]
+
+def _poll_cfg(cfg: Dict[str, Any]) -> PollCfg:
+    """PollCfg from the 'polling:' block; malformed values raise ValueError at startup."""
+    p = (cfg.get("polling") or {}) if isinstance(cfg, dict) else {}
+    try:
+        pc = _build_poll_cfg(p)
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid 'polling:' settings: {e}") from e
+    if pc.period_s <= 0:
+        raise ValueError(f"Invalid 'polling:' settings: period_s must be > 0 (got {pc.period_s})")
+    if pc.mode not in ("bulk", "sequential"):
+        raise ValueError(f"Invalid 'polling:' settings: read_mode must be bulk or sequential (got {pc.mode!r})")
+    return pc
+
+def _build_poll_cfg(p: Dict[str, Any]) -> PollCfg:
+    per_measure_delay_ms = int(p.get("per_measure_delay_ms", 0))  # on top of the bus silence
+    delay_between_devices_ms = int(p.get("delay_ms_between_devices", 0))
+    return PollCfg(
+        period_s=float(p.get("period_s", 5)),
+        mode=str(p.get("read_mode", "bulk")).lower(),
+        per_measure_delay=max(0.0, per_measure_delay_ms / 1000.0),
+        debug_log=bool(p.get("debug_log", False)),
+        delay_between_devices=max(0.0, delay_between_devices_ms / 1000.0),
+        # Change filter: unchanged devices are only re-published every heartbeat_cycles (0 = always publish)
+        heartbeat_cycles=int(p.get("heartbeat_cycles", 60)),
+        change_rel_tol=float(p.get("change_rel_tol", 1e-4)),
+        # Per-field scan intervals (polling.fields.<name>.interval_s; default every cycle)
+        intervals=_field_intervals(p),
+    )
 
-            payload = {
-                "id": unit_id,
-                "type": dev_type,
-                "name": name,
-                **vals,
-            }
+def _poll_once(client: mqtt.Client, pc: PollCfg, devices: List[DeviceCtx], state: Optional[_PollState] = None) -> None:
+    mode = pc.mode
+    per_measure_delay = pc.per_measure_delay
+    debug_log = pc.debug_log
+    delay_between_devices_s = pc.delay_between_devices
+    change_rel_tol = pc.change_rel_tol
+    intervals = pc.intervals
+    heartbeat = state is None or pc.heartbeat_cycles <= 0 or state.cycle % pc.heartbeat_cycles == 0
+    if _republish_evt.is_set():
+        _republish_evt.clear()
+        heartbeat = True  # a new broker session (or a restarted broker) gets a full snapshot
+    now = time.monotonic()
 
-            if debug_log:
-                dbg = {"measurements": {"deviceid": unit_id, "type": dev_type, **vals}}
-                log.info(json.dumps(dbg, ensure_ascii=False, indent=2))
+    if not devices:
+        log.warning("No devices configured; nothing to poll.")
+        return
 
-            topic = f"{base_topic}/{_topic_key(name, unit_id)}/state"
-            client.publish(topic, json.dumps(payload, ensure_ascii=False), qos=qos, retain=retain)
-        except Exception as e:
-            log.error("Read/publish failed for unit %s: %s", d.get("id"), e)
-        finally:
-            if delay_between_devices_s > 0:
-                time.sleep(delay_between_devices_s)
+    # Payloads are queued during the reads and published together at the end of the cycle
+    outbox: List[Tuple[str, bytes, int, bool]] = []
+
+    def _poll_bus(bus: BusClient, group: List[DeviceCtx]) -> None:
+        for ctx in group:
+            try:
+                unit_id = ctx.uid
+                dev_type = ctx.dev_type
+                topic = ctx.topic
+                ivals = ctx.intervals or intervals
+                due = list(MEAS_FIELDS) if state is None else _due_fields(state, topic, ivals, now)
+
+                if not due:
+                    vals = {}
+                elif mode != "bulk":
+                    # per_measure_delay is there for slow RS-485 units; TCP devices only pause with tcp.inter_read_delay_ms
+                    pause = per_measure_delay if ctx.tcp is None else float(ctx.tcp.get("inter_read_delay_ms", 0)) / 1000.0
+                    vals = _read_device_sequential(dev_type, bus, unit_id, pause, step_log=debug_log, fields=due)
+                else:
+                    vals = _read_device_bulk(dev_type, bus, unit_id, fields=due, meter=ctx.meter)
+
+                if state is not None:
+                    for key, val in vals.items():
+                        if math.isnan(val):
+                            continue  # failed read: keep the last good value, the field stays due
+                        # first successful read of a field: backdate it by the device's phase so the
+                        # next one is staggered (a failed first read stays unstamped, not backdated)
+                        first = (topic, key) not in state.last_read_at
+                        state.last_read_at[(topic, key)] = now - ctx.phase * ivals[key] if first else now
+                        state.last_values[(topic, key)] = val
+                    # Fields not due this cycle keep their last reading
+                    vals = {k: state.last_values.get((topic, k), _NAN) for k in MEAS_FIELDS}
+
+                payload = ctx.payload
+                payload.update(vals)
+
+                if debug_log:
+                    dbg = {"measurements": {"deviceid": unit_id, "type": dev_type, **vals}}
+                    log.info(_json_pretty(dbg))
+
+                if not heartbeat and not _values_changed(vals, state.last_published, topic, change_rel_tol):
+                    log.debug("Unit %s unchanged; publish skipped", unit_id)
+                    continue
+                outbox.append((topic, _json_bytes(payload), ctx.qos, ctx.retain))
+                if state is not None:
+                    for key, val in vals.items():
+                        state.last_published[(topic, key)] = val
+            except Exception as e:
+                log.error("Read failed for unit %s: %s", ctx.uid, e)
+            finally:
+                if delay_between_devices_s > 0:
+                    time.sleep(delay_between_devices_s)
+
+    # Devices are grouped per bus: one bus keeps its order, several buses run in parallel.
+    # A TCP gateway is a bus of its own (its serial side still serves one request at a time),
+    # so TCP devices never wait behind the RS-485 units.
+    groups: Dict[int, Tuple[BusClient, List[DeviceCtx]]] = {}
+    for ctx in devices:
+        groups.setdefault(id(ctx.bus), (ctx.bus, []))[1].append(ctx)
+    if len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix="bus") as ex:
+            list(ex.map(lambda g: _poll_bus(*g), groups.values()))
+    else:
+        for bus, group in groups.values():
+            _poll_bus(bus, group)
+
+    if state is not None and _connected_once.is_set() and not client.is_connected():
+        # stale readings are not worth a burst on reconnect; on_connect triggers a full snapshot instead
+        log.warning("MQTT not connected; %d payload(s) of this cycle dropped", len(outbox))
+        return
+    # the ack wait never runs past one poll period
+    _publish_batch(client, outbox, pc.period_s)
 
 def run_poll(cfg: Dict[str, Any], oneshot: bool = False) -> None:
-    link = _make_link(cfg)
+    # settings first: a bad 'polling:' block fails before any port or broker connection is opened
+    pc = _poll_cfg(cfg)
+    # one serial client per bus, shared by every RTU unit on it
+    buses = {name: BusClient(link) for name, link in _serial_links(cfg).items()}
+    # and one TCP client per gateway, kept open across cycles (reopened on the next request after an error)
+    tcp_buses: Dict[Tuple[str, int], BusClient] = {}
+    devices = _device_contexts(cfg, buses, tcp_buses)
     client = _mqtt_client(cfg)
     _mqtt_connect(client, cfg)
 
     # HA discovery
-    _ha_publish_discovery(client, cfg)
+    _ha_publish_discovery(client, cfg, devices)
 
-    period_s = float((cfg.get("polling") or {}).get("period_s", 5))
+    period_s = pc.period_s
     if oneshot:
-        _poll_once(client, cfg, link)
+        _poll_once(client, pc, devices)
+        for bus in (*buses.values(), *tcp_buses.values()):
+            bus.close()
         client.loop_stop()
         client.disconnect()
         return
@@ -511,19 +682,29 @@ def run_poll(cfg: Dict[str, Any], oneshot: bool = False) -> None:
         pass
 
     log.info("Starting polling loop; period_s=%.3f", period_s)
+    state = _PollState()
+    # Cycles start on absolute monotonic deadlines: no drift from the poll's own
+    # duration and no jumps when NTP steps the wall clock
+    next_deadline = time.monotonic()
     while not _stop_evt.is_set():
-        start = time.time()
-        _poll_once(client, cfg, link)
-        elapsed = time.time() - start
-        delay = max(0.0, period_s - elapsed)
-        _stop_evt.wait(delay)
-
+        _poll_once(client, pc, devices, state)
+        state.cycle += 1
+        next_deadline += period_s
+        now = time.monotonic()
+        if now - next_deadline > period_s:
+            # overran by more than a period: restart the schedule instead of catching up with back-to-back polls
+            log.warning("Poll cycle overran the period (%.3fs late)", now - next_deadline)
+            next_deadline = now
+        _stop_evt.wait(max(0.0, next_deadline - now))
+
+    for bus in (*buses.values(), *tcp_buses.values()):
+        bus.close()
     client.loop_stop()
     client.disconnect()
 
 def main():
     ap = argparse.ArgumentParser(description="Generic Modbus meters poller (DDS661, SDM230).")
-    ap.add_argument("--config", required=True, help="YAML config file")
+    ap.add_argument("--config", required=True, help="YAML (or JSON) config file")
     ap.add_argument("--oneshot", action="store_true", help="Read/publish once and exit")
     ap.add_argument("--log", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
     args = ap.parse_args()
@@ -531,7 +712,13 @@ def main():
     logging.basicConfig(level=getattr(logging, args.log.upper(), logging.INFO),
                         format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
-    cfg = _load_yaml(args.config)
+    cfg = load_config(args.config, use_cache=False)
+    if not isinstance(cfg, dict):
+        raise SystemExit(f"ERROR: {args.config}: the top level must be a mapping")
+    try:
+        _poll_cfg(cfg)
+    except ValueError as e:
+        raise SystemExit(f"ERROR: {args.config}: {e}")
     run_poll(cfg, oneshot=args.oneshot)
 
 if __name__ == "__main__":
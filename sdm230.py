@@ -14,16 +14,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Optional
 
-from pymodbus.client import ModbusSerialClient
-from pymodbus.exceptions import ModbusException
-
 # Reuse helpers from the DDS661 lib to keep behavior identical
 from dds661 import (
-    LinkConfig,
+    MEAS_FIELDS,
+    _ModbusMeter,
     _float_to_registers,
-    _registers_to_float,
-    _call_with_unit,
-    _write_with_unit,
 )
 
 # ----------------------- Input Register Map (addresses) ----------------------
@@ -38,6 +33,21 @@ IN_E_POS   = 0x0048  # Import active energy (kWh)
 IN_E_REV   = 0x004A  # Export active energy (kWh)
 IN_E_TOT   = 0x0156  # Total active energy (kWh)
 
+INPUT_MAP = {
+    "voltage": IN_VOLTAGE,
+    "current": IN_CURRENT,
+    "p_active": IN_P_ACT,
+    "pf": IN_PF,
+    "freq": IN_FREQ,
+    "e_total": IN_E_TOT,
+    "e_pos": IN_E_POS,
+    "e_rev": IN_E_REV,
+}
+
+# Only merge truly adjacent values (freq/import/export): the registers in
+# between the others are not defined for the single-phase SDM230.
+MAX_READ_GAP = 0
+
 # ----------------------- Holding (4x) Register Map ---------------------------
 REG_PARITY = 0x0012  # float-coded parity/stopbits mode (see mapping below)
 REG_SLAVE  = 0x0014  # float-coded Modbus node (1..247)
@@ -45,13 +55,13 @@ REG_BAUD   = 0x001C  # float-coded baud rate (enum)
 
 # ---------------------------- Dataclasses ------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Params:
     baud: float    # actual numeric baud (e.g., 9600.0)
     parity: float  # code as in device (0,1,2,3) — see PARITY_CODES
     slave: float   # 1..247
 
-@dataclass
+@dataclass(slots=True)
 class Measurements:
     voltage: float
     current: float
@@ -87,62 +97,25 @@ PARITY_CODES = {
 
 # --------------------------- Client Helper -----------------------------------
 
-class SDM230:
-    def __init__(self, link: LinkConfig, unit: int = 1):
-        self.link = link
-        self.unit = int(unit)
-
-    def _make_client(self) -> ModbusSerialClient:
-        kwargs = dict(
-            port=self.link.port,
-            baudrate=self.link.baudrate,
-            parity=self.link.parity,
-            stopbits=self.link.stopbits,
-            bytesize=self.link.bytesize,
-            timeout=self.link.timeout,
-        )
-        RTUFramer = None
-        try:
-            from pymodbus.framer.rtu_framer import ModbusRtuFramer as RTUFramer  # newer
-        except Exception:
-            try:
-                from pymodbus.framer.rtu import ModbusRtuFramer as RTUFramer      # older 3.x
-            except Exception:
-                RTUFramer = None
-        if RTUFramer is not None:
-            try:
-                return ModbusSerialClient(framer=RTUFramer, **kwargs)
-            except TypeError:
-                pass
-        try:
-            return ModbusSerialClient(method="rtu", **kwargs)
-        except TypeError:
-            return ModbusSerialClient(**kwargs)
+class SDM230(_ModbusMeter):
+
+    _open_error = "Unable to open serial port"
 
     # ------------------------- Params ----------------------------------------
+    PARAM_MAP = {"baud": REG_BAUD, "parity": REG_PARITY, "slave": REG_SLAVE}
 
-    def read_params(self) -> Params:
-        cli = self._make_client()
-        if not cli.connect():
-            raise RuntimeError("Unable to open serial port")
-        try:
-            def _r(addr: int) -> float:
-                rr = _call_with_unit(cli.read_holding_registers, address=addr, count=2, unit_id=self.unit)
-                if rr.isError():
-                    raise ModbusException(rr)
-                return _registers_to_float((rr.registers[0], rr.registers[1]))
-            baud_code = _r(REG_BAUD)
-            baud = _BAUD_FROM_CODE.get(float(baud_code), baud_code)  # fall back to code if unknown
-            parity = _r(REG_PARITY)
-            slave = _r(REG_SLAVE)
-            return Params(baud=float(baud), parity=float(parity), slave=float(slave))
-        finally:
-            cli.close()
+    def read_params(self, fields=None) -> Params:
+        """Read the holding params; with ``fields`` only those are read (the others are NaN)."""
+        vals = self._read_param_values(fields)
+        vals["baud"] = _BAUD_FROM_CODE.get(vals["baud"], vals["baud"])  # fall back to code if unknown
+        return Params(**vals)
 
     def write_params(self, baud: Optional[float] = None,
                      parity: Optional[float] = None,
                      slave: Optional[float] = None) -> Dict[str, str]:
-        cur = self.read_params()
+        # pre-read only what is going to be compared/written
+        needed = [name for name, val in (("slave", slave), ("parity", parity), ("baud", baud)) if val is not None]
+        cur = self.read_params(needed) if needed else None
         # Map baud (actual) to device code if user passes a standard speed
         def _desired(name: str, val: Optional[float]) -> Optional[float]:
             if val is None:
@@ -157,53 +130,29 @@ class SDM230:
                 ("parity", REG_PARITY, _desired("parity", parity)),
                 ("baud", REG_BAUD, _desired("baud", baud))]
 
-        cli = self._make_client()
-        if not cli.connect():
-            raise RuntimeError("Unable to open serial port")
-
         report: Dict[str, str] = {}
-        try:
-            for name, addr, desired in plan:
-                if desired is None:
-                    report[name] = "skipped (None)"
-                    continue
-                cur_val = getattr(cur, name)
-                if abs(cur_val - float(desired)) < 1e-6:
-                    report[name] = f"unchanged ({desired})"
-                    continue
-                hi, lo = _float_to_registers(float(desired))
-                rq = _write_with_unit(cli.write_registers, address=addr, values=[hi, lo], unit_id=self.unit)
-                if rq.isError():
-                    report[name] = f"ERROR: {rq}"
-                else:
-                    report[name] = f"written ({desired})"
-                    if name == "slave":
-                        self.unit = int(desired)
-            return report
-        finally:
-            cli.close()
+        for name, addr, desired in plan:
+            if desired is None:
+                report[name] = "skipped (None)"
+                continue
+            cur_val = getattr(cur, name)
+            if abs(cur_val - float(desired)) < 1e-6:
+                report[name] = f"unchanged ({desired})"
+                continue
+            hi, lo = _float_to_registers(float(desired))
+            rq = self.bus.write(addr, [hi, lo], self.unit)
+            if rq.isError():
+                report[name] = f"ERROR: {rq}"
+            else:
+                report[name] = f"written ({desired})"
+                if name == "slave":
+                    self.unit = int(desired)
+        return report
 
     # ------------------------ Measurements -----------------------------------
 
+    INPUT_MAP = INPUT_MAP
+    MAX_READ_GAP = MAX_READ_GAP
+
     def read_measurements(self) -> Measurements:
-        cli = self._make_client()
-        if not cli.connect():
-            raise RuntimeError("Unable to open serial port")
-        try:
-            def _rin(addr: int) -> float:
-                rr = _call_with_unit(cli.read_input_registers, address=addr, count=2, unit_id=self.unit)
-                if hasattr(rr, "isError") and rr.isError():
-                    return float("nan")
-                return _registers_to_float((rr.registers[0], rr.registers[1]))
-            return Measurements(
-                voltage=_rin(IN_VOLTAGE),
-                current=_rin(IN_CURRENT),
-                p_active=_rin(IN_P_ACT),
-                pf=_rin(IN_PF),
-                freq=_rin(IN_FREQ),
-                e_total=_rin(IN_E_TOT),
-                e_pos=_rin(IN_E_POS),
-                e_rev=_rin(IN_E_REV),
-            )
-        finally:
-            cli.close()
+        return Measurements(**self.read_fields(MEAS_FIELDS))
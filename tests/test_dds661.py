@@ -0,0 +1,194 @@
+import math
+import time
+
+import pytest
+
+pytest.importorskip("pymodbus")
+
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from dds661 import DDS661, LinkConfig, _float_to_registers, IN_E_POS, REG_SLAVE
+from sdm230 import SDM230, REG_BAUD as S_REG_BAUD
+
+
+class _Regs:
+    def __init__(self, registers):
+        self.registers = registers
+
+    def isError(self):
+        return False
+
+
+class _FakeBus:
+    """BusClient stand-in: fails the reads starting at the addresses in `fail`."""
+
+    def __init__(self, fail=(), exc=ModbusIOException, holding=None):
+        self.link = LinkConfig()
+        self.fail = set(fail)
+        self.exc = exc
+        self.holding = holding or {}
+        self.calls = []
+
+    def read_input(self, address, count, unit):
+        self.calls.append((address, count))
+        if address in self.fail:
+            raise self.exc("no response")
+        regs = []
+        for _ in range(count // 2):
+            regs.extend(_float_to_registers(1.5))
+        return _Regs(regs + [0] * (count % 2))
+
+    def read_holding(self, address, count, unit):
+        self.calls.append((address, count))
+        return _Regs(list(_float_to_registers(self.holding.get(address, 0.0))))
+
+
+def test_read_fields_timeout_on_one_block_marks_only_its_fields_nan():
+    bus = _FakeBus(fail={0x0000})
+    dev = DDS661(bus.link, unit=1, bus=bus)
+    vals = dev.read_fields(["voltage", "current", "e_pos", "e_rev"])
+    assert len(bus.calls) == 2  # the second block is still read
+    assert math.isnan(vals["voltage"]) and math.isnan(vals["current"])
+    assert vals["e_pos"] == 1.5
+
+
+def test_read_fields_connection_error_propagates():
+    bus = _FakeBus(fail={IN_E_POS}, exc=ConnectionException)
+    dev = DDS661(bus.link, unit=1, bus=bus)
+    with pytest.raises(ConnectionException):
+        dev.read_fields(["voltage", "e_pos"])
+
+
+@pytest.mark.parametrize("cls, name, addr, raw, expected", [
+    (DDS661, "slave", REG_SLAVE, 12.0, 12.0),
+    (SDM230, "baud", S_REG_BAUD, 1.0, 4800.0),
+])
+def test_read_params_subset_reads_only_the_requested_registers(cls, name, addr, raw, expected):
+    bus = _FakeBus(holding={addr: raw})
+    params = cls(bus.link, unit=1, bus=bus).read_params([name])
+    assert bus.calls == [(addr, 2)]
+    assert getattr(params, name) == expected
+    assert all(math.isnan(getattr(params, k)) for k in cls.PARAM_MAP if k != name)
+
+
+class _CommParams:
+    def __init__(self, timeout):
+        self._timeout = timeout
+        self.sets = []
+
+    @property
+    def timeout_connect(self):
+        return self._timeout
+
+    @timeout_connect.setter
+    def timeout_connect(self, value):
+        self.sets.append(value)
+        self._timeout = value
+
+
+class _SilentClient:
+    """Serial client with no unit behind it: waits the pymodbus 3.7+ reply timeout, then fails."""
+
+    def __init__(self, timeout):
+        self.comm_params = _CommParams(timeout)
+
+    def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+    def read_input_registers(self, address, count=1, **kwargs):
+        time.sleep(self.comm_params.timeout_connect)
+        raise ModbusIOException("no response")
+
+
+def _silent_bus(fast_rtu, timeout=0.5):
+    from dds661 import BusClient
+
+    bus = BusClient(LinkConfig(timeout=timeout, fast_rtu=fast_rtu))
+    cli = _SilentClient(timeout)
+    bus._make_client = lambda: cli
+    return bus, cli
+
+
+def _failure_time(bus, count):
+    start = time.monotonic()
+    with pytest.raises(ModbusIOException):
+        bus.read_input(0, count, 1)
+    return time.monotonic() - start
+
+
+def test_fast_rtu_dead_unit_fails_within_reply_time():
+    bus, _ = _silent_bus(fast_rtu=True)
+    assert _failure_time(bus, 2) < 0.15  # ~50 ms instead of the 0.5 s link timeout
+
+
+def test_dead_unit_without_fast_rtu_waits_link_timeout():
+    bus, _ = _silent_bus(fast_rtu=False)
+    assert _failure_time(bus, 2) >= 0.45
+
+
+def test_fast_rtu_reply_timeout_only_set_on_change():
+    bus, cli = _silent_bus(fast_rtu=True)
+    for count in (2, 2, 56, 56, 2):
+        with pytest.raises(ModbusIOException):
+            bus.read_input(0, count, 1)
+    assert len(cli.comm_params.sets) == 3
+
+
+class _ScriptClient:
+    """Client whose reads raise the queued exceptions, then answer."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.closed = False
+
+    def connect(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def read_input_registers(self, address, count=1, **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        return _Regs([0] * count)
+
+
+def _scripted_bus(*errors):
+    from dds661 import BusClient
+
+    bus = BusClient(LinkConfig())
+    bus._silent = 0.0
+    made = []
+    queue = list(errors)
+
+    def _make():
+        made.append(_ScriptClient(queue))
+        return made[-1]
+
+    bus._make_client = _make
+    return bus, made
+
+
+@pytest.mark.parametrize("exc", [ConnectionException("port gone"), OSError("EIO")])
+def test_transport_error_reconnects_and_retries_once(exc):
+    bus, made = _scripted_bus(exc)
+    assert bus.read_input(0, 2, 1).registers == [0, 0]
+    assert len(made) == 2 and made[0].closed
+
+
+def test_transport_error_twice_propagates():
+    bus, made = _scripted_bus(ConnectionException("a"), ConnectionException("b"))
+    with pytest.raises(ConnectionException):
+        bus.read_input(0, 2, 1)
+    assert len(made) == 2 and bus._client is None
+
+
+def test_unit_error_keeps_the_client():
+    bus, made = _scripted_bus(ModbusIOException("no response"))
+    with pytest.raises(ModbusIOException):
+        bus.read_input(0, 2, 1)
+    assert bus.read_input(0, 2, 1).registers == [0, 0]
+    assert len(made) == 1 and not made[0].closed
@@ -0,0 +1,49 @@
+import os
+import stat
+
+import pytest
+
+pytest.importorskip("yaml")
+
+import meter_core
+
+
+def _big_yaml(tmp_path, host):
+    path = tmp_path / "config.yaml"
+    pad = "".join(f"  - {{id: {i}, type: dds661, name: device {i:04d}}}\n" for i in range(80))
+    path.write_text(f"mqtt:\n  host: {host}\n  password: secret\ndevices:\n{pad}")
+    os.chmod(path, 0o600)
+    return path
+
+
+def _fresh(path):
+    meter_core._CONFIG_CACHE.clear()
+    return meter_core.load_config(str(path))
+
+
+def test_sidecar_written_with_yaml_permissions(tmp_path):
+    path = _big_yaml(tmp_path, "a")
+    assert _fresh(path)["mqtt"]["host"] == "a"
+    side = str(path) + ".cache.json"
+    assert stat.S_IMODE(os.stat(side).st_mode) & ~0o600 == 0
+
+
+def test_sidecar_ignored_for_yaml_with_older_mtime(tmp_path):
+    path = _big_yaml(tmp_path, "a")
+    _fresh(path)
+    old = os.stat(path).st_mtime_ns
+    # restored copy: same size, different content, mtime set back before the sidecar's
+    path.write_text(path.read_text().replace("host: a", "host: b"))
+    os.utime(path, ns=(old - 10**9, old - 10**9))
+    assert _fresh(path)["mqtt"]["host"] == "b"
+
+
+def test_sidecar_leaves_out_the_mqtt_credentials(tmp_path):
+    path = _big_yaml(tmp_path, "a")
+    _fresh(path)
+    side = (tmp_path / "config.yaml.cache.json").read_text()
+    assert "secret" not in side and "mqtt" not in side
+    cached = _fresh(path)  # from the sidecar
+    assert "mqtt" not in cached and len(cached["devices"]) == 80
+    # a full load in the same process does not get the sidecar's copy
+    assert meter_core.load_config(str(path), use_cache=False)["mqtt"]["password"] == "secret"
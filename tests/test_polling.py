@@ -0,0 +1,129 @@
+import pytest
+
+pytest.importorskip("pymodbus")
+pytest.importorskip("paho.mqtt")
+
+import polling
+from dds661 import BusClient, LinkConfig
+from meter_core import bus_name
+
+
+class _Info:
+    rc = 0
+
+
+class _Client:
+    def __init__(self, connected):
+        self.connected = connected
+        self.published = []
+
+    def is_connected(self):
+        return self.connected
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        self.published.append(topic)
+        return _Info()
+
+
+class _Meter:
+    """Reads 230.0 for every field, except the values queued in `script` (one dict per call)."""
+
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.calls = []
+
+    def read_fields(self, names):
+        self.calls.append(list(names))
+        vals = dict.fromkeys(names, 230.0)
+        if self.script:
+            vals.update((k, v) for k, v in self.script.pop(0).items() if k in vals)
+        return vals
+
+
+def _setup(n_devices=1, fields=None, script=()):
+    cfg = {
+        "mqtt": {"base_topic": "t"},
+        "polling": {"period_s": 1, "heartbeat_cycles": 0, "fields": fields or {}},
+        "devices": [{"id": 10 + i, "type": "dds661", "name": "ABCD"[i]} for i in range(n_devices)],
+    }
+    devices = polling._device_contexts(cfg, {bus_name({}): BusClient(LinkConfig())})
+    for ctx in devices:
+        ctx.meter = _Meter(script)
+    return polling._poll_cfg(cfg), devices
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(polling.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture(autouse=True)
+def _reset_events():
+    polling._connected_once.clear()
+    polling._republish_evt.clear()
+    yield
+    polling._connected_once.clear()
+
+
+def test_first_cycle_before_connack_is_published():
+    pc, devices = _setup()
+    client = _Client(connected=False)
+    polling._poll_once(client, pc, devices, polling._PollState())
+    assert client.published == ["t/a/state"]
+
+
+def test_cycle_dropped_after_connection_loss():
+    pc, devices = _setup()
+    polling._connected_once.set()
+    client = _Client(connected=False)
+    polling._poll_once(client, pc, devices, polling._PollState())
+    assert client.published == []
+
+
+def test_failed_slow_field_keeps_last_value_and_stays_due(clock):
+    pc, (ctx,) = _setup(fields={"e_total": {"interval_s": 60}},
+                        script=[{"e_total": 1.0}, {"e_total": float("nan")}])
+    state, client = polling._PollState(), _Client(connected=True)
+    polling._poll_once(client, pc, [ctx], state)
+    clock[0] += 61
+    polling._poll_once(client, pc, [ctx], state)
+    assert ctx.payload["e_total"] == 1.0
+    clock[0] += 1
+    polling._poll_once(client, pc, [ctx], state)
+    assert "e_total" in ctx.meter.calls[-1]  # retried next cycle, not 60 s later
+
+
+def test_phase_backdate_only_on_successful_first_read(clock):
+    pc, (a, b) = _setup(n_devices=2, fields={"e_total": {"interval_s": 60}})
+    b.meter.script = [{"e_total": float("nan")}]
+    state, client = polling._PollState(), _Client(connected=True)
+    polling._poll_once(client, pc, [a, b], state)
+    assert (b.topic, "e_total") not in state.last_read_at
+    clock[0] += 1
+    polling._poll_once(client, pc, [a, b], state)
+    assert "e_total" in b.meter.calls[-1] and "e_total" not in a.meter.calls[-1]
+    # the successful read is the one backdated by b's phase (0.5 of the interval)
+    assert state.last_read_at[(b.topic, "e_total")] == clock[0] - 30
+
+
+def test_device_bus_matches_name_or_port_as_string():
+    cfg = {
+        "serial": [{"name": 1, "port": "/dev/ttyUSB0"}, {"name": "b2", "port": "/dev/ttyUSB1"}],
+        "devices": [{"id": 1, "bus": 1}, {"id": 2, "bus": "/dev/ttyUSB1"}, {"id": 3, "bus": "nope"}],
+    }
+    buses = {name: BusClient(link) for name, link in polling._serial_links(cfg).items()}
+    devices = polling._device_contexts(cfg, buses)
+    assert [(d.uid, d.bus) for d in devices] == [(1, buses["1"]), (2, buses["b2"])]
+
+
+def test_discovery_skips_invalid_device_entries():
+    cfg = {
+        "home_assistant": {"enabled": True},
+        "devices": [{"id": "x"}, {"id": 5, "type": "nope"}, {"id": 7, "name": "Main"}],
+    }
+    devices = polling._device_contexts(cfg, {bus_name({}): BusClient(LinkConfig())})
+    client = _Client(True)
+    polling._ha_publish_discovery(client, cfg, devices)
+    assert client.published and all("/dds661_7_" in t for t in client.published)